@@ -1,10 +1,10 @@
-from bisect import bisect
 from collections import OrderedDict
+import sys
+from typing import Optional, Sequence
 
+import numpy as np
 import pandas as pd
 
-from utils import flatten2d
-
 
 # Memory values with at most 2 set bits, which are relatively
 # close to each other (at most 3 positions away).
@@ -14,12 +14,15 @@ MEM_MIB_VALUES = [
     for e in [7, 8, 9]
     for i in [0, 3, 2, 1]
 ]
+_MEM_MIB_ARR = np.asarray(MEM_MIB_VALUES)
 MICROVM_EXTRA_MEM_MIB = 50
 
 
-def _quantize_mem_size(mem_val: int) -> int:
-    idx = bisect(MEM_MIB_VALUES, mem_val + MICROVM_EXTRA_MEM_MIB)
-    return MEM_MIB_VALUES[idx]
+def _quantize_mem_sizes(mem_vals: Sequence[int]) -> list[int]:
+    idx = np.searchsorted(
+        _MEM_MIB_ARR, np.asarray(mem_vals) + MICROVM_EXTRA_MEM_MIB, side="right"
+    )
+    return _MEM_MIB_ARR[idx].tolist()
 
 
 FAASCELL_FUNCTIONS = OrderedDict(
@@ -81,30 +84,49 @@ FAASCELL_FUNCTIONS = OrderedDict(
     }
 )
 
+# Flattened view of FAASCELL_FUNCTIONS, for a single tuple unpack per Workload:
+# benchmark -> (image, memory_mb, process_args or None)
+_FAST_BENCH: dict[str, tuple[str, int, Optional[str]]] = {
+    bench: (
+        sys.intern(info["image"]),
+        info["memory_mb"],
+        info.get("process_args"),
+    )
+    for bench, info in FAASCELL_FUNCTIONS.items()
+}
+
 
 def workload_json_entries(workloads: pd.DataFrame) -> list[str]:
     """
     :param workloads: A dataframe produced by `preprocess.workloads_preprocess`
     """
-    ret = []
-    wl_names = set()  # wl: workload
+    entries = {}  # wl_name -> (image, memory_mb, process_args)
+    bench_map = _FAST_BENCH  # local name: skip the global lookup per Workload
     # Record all unique Workloads and their memory footprint
-    for workload in flatten2d(workloads["workloads"].tolist()):
-        benchmark_info = FAASCELL_FUNCTIONS[workload.benchmark]
+    for workload in workloads["workloads"].explode().tolist():
+        image, bench_memory_mb, process_args = bench_map[workload.benchmark]
         # The "or" holds for either every iteration (icy2) or none of them (icy1)
-        memory_mb = workload.memory_mb or benchmark_info["memory_mb"]
+        memory_mb = workload.memory_mb or bench_memory_mb
         wl_name = workload.get_name()
         # Verify the uniqueness of wl_name
-        assert wl_name not in wl_names, f'"{wl_name}" inserted twice'
-        wl_names.add(wl_name)
+        assert wl_name not in entries, f'"{wl_name}" inserted twice'
+        entries[wl_name] = (image, memory_mb, process_args)
+
+    # Sort by name up front, rather than the resulting dicts afterwards
+    wl_names = sorted(entries)
+    # Quantize the memory footprints of all Workloads at once
+    quantized = _quantize_mem_sizes([entries[name][1] for name in wl_names])
+
+    ret = []
+    for wl_name, memory in zip(wl_names, quantized):
+        image, _, process_args = entries[wl_name]
         workload_info = {
             "id": wl_name,
-            "image": benchmark_info["image"],
-            "memory": _quantize_mem_size(memory_mb),
+            "image": image,
+            "memory": memory,
         }
-        if "process_args" in benchmark_info:
+        if process_args is not None:
             # Only applies to rnn_serving for now
-            workload_info["process_args"] = benchmark_info["process_args"]
+            workload_info["process_args"] = process_args
         ret.append(workload_info)
-    ret.sort(key=lambda wl: wl["id"])
     return ret
@@ -12,44 +12,58 @@ class Distribution:
 
     def __init__(self, values: Sequence, weights: Sequence) -> None:
         assert len(values) == len(weights), "#values != #weights"
-        so = np.argsort(values)
-        sorted_values = [float(values[i]) for i in so]
-        sorted_weights = [int(weights[i]) for i in so]
-
-        # Merge duplicates
-        values_dedup = [float("-inf")]
-        weights_dedup = [0]
-
-        curr = None
-        for i, value in enumerate(sorted_values):
-            if value == curr:
-                weights_dedup[-1] += sorted_weights[i]
-            else:
-                values_dedup.append(value)
-                weights_dedup.append(sorted_weights[i])
-                curr = value
-
-        weights_norm_cumsum = np.array(weights_dedup).cumsum().astype(np.float64)
+        values_arr = np.asarray(values)
+        # Keep times integral when given as such (e.g., the trace's "dur_ms")
+        if np.issubdtype(values_arr.dtype, np.integer):
+            values_arr = values_arr.astype(np.int64, copy=False)
+            guard = np.iinfo(np.int64).min
+        else:
+            values_arr = values_arr.astype(np.float64, copy=False)
+            guard = float("-inf")
+        weights_arr = np.asarray(weights, dtype=np.float64)
+
+        # Sort and merge duplicates, accumulating their weights
+        values_dedup, inverse = np.unique(values_arr, return_inverse=True)
+        weights_dedup = np.bincount(
+            inverse, weights=weights_arr, minlength=len(values_dedup)
+        )
+        values_dedup = np.concatenate(([guard], values_dedup))
+        weights_dedup = np.concatenate(([0.0], weights_dedup))
+
+        weights_norm_cumsum = weights_dedup.cumsum()
         weights_norm_cumsum /= weights_norm_cumsum[-1]
 
         # We have constructed the cumulative distribution function (CDF). We
         # store the x points at which there is a "step" (we meet a new value
         # in the given sequence) and what is the value of y after the step.
-        object.__setattr__(self, "cdf_x", np.array(values_dedup))
+        object.__setattr__(self, "cdf_x", values_dedup)
         object.__setattr__(self, "cdf_y", weights_norm_cumsum)
+        # Scalar lookups are faster with `bisect` on plain lists than with
+        # `np.searchsorted` (or `bisect`) on ndarrays; keep a copy of both.
+        object.__setattr__(self, "_cdf_x_list", values_dedup.tolist())
+        object.__setattr__(self, "_cdf_y_list", weights_norm_cumsum.tolist())
 
     def cdf(self, x: int) -> float:
         # FIXME(ckatsak): `x` (i.e., `values`) should be float since it's time?
-        pos = bisect(self.cdf_x, x)
-        return float(self.cdf_y[pos - 1])
+        pos = bisect(self._cdf_x_list, x)
+        return self._cdf_y_list[pos - 1]
 
     def inverse_cdf(self, u: float) -> int:
         # FIXME(ckatsak): Should return float (since it's time)? Fix trace!
         assert 0 <= u <= 1
-        pos = bisect(self.cdf_y, u)
+        pos = bisect(self._cdf_y_list, u)
         # print(
         #     f"u = {u}, pos = {pos}\n"
         #     f"\tcdf_y[{pos-1}] = {self.cdf_y[pos-1]} --> cdf_x[{pos-1}] = {self.cdf_x[pos-1]}\n"
         #     f"\tcdf_y[{pos}] = {self.cdf_y[pos]} --> cdf_x[{pos}] = {self.cdf_x[pos]}\n"
         # )
-        return int(self.cdf_x[pos])
+        return int(self._cdf_x_list[pos])
+
+    def inverse_cdf_batch(self, u: np.ndarray) -> np.ndarray:
+        """
+        Vectorized counterpart of `inverse_cdf`, for an array of `u` values.
+        """
+        assert ((0 <= u) & (u <= 1)).all()
+        pos = np.searchsorted(self.cdf_y, u, side="right")
+        # Truncate like `inverse_cdf` does; a no-op for (int64) integral times
+        return self.cdf_x[pos].astype(np.int64, copy=False)
@@ -1,10 +1,10 @@
 from dataclasses import dataclass
-import random
 
 import numpy as np
 
 from distribution import Distribution
 from mapping import FunctionMapping
+from ops import round_threshold
 from specification import Specification, SpecificationRow
 from workload import Workload
 
@@ -40,21 +40,15 @@ class RequestGenerator:
             values = fm.trace["dur_ms"].tolist()
             weights = fm.trace["inv_count"].tolist()
             self.exec_time_dist = Distribution(values, weights)
+            # Resolve sampled execution times straight to their Workloads,
+            # bypassing `FunctionMapping.__call__()` in the sampling loop:
+            self._exec_time_to_wl: dict[float, Workload] = dict(zip(values, fm.mapping))
 
     def spec_generate(self) -> Specification:
         """
         Generate an experiment specification employing FaaSRail's "Spec" mode.
         """
 
-        # TODO(phtof): This must be documented
-        def custom_round(value: float) -> np.integer:
-            floor = np.floor(value)
-            ceiling = np.ceil(value)
-            if value - floor < 0.35:
-                return np.intc(floor)
-            else:
-                return np.intc(ceiling)
-
         if self.config.gen_mode != "spec":
             raise RuntimeError(
                 f'RequestGenerator instance configured for "{self.config.gen_mode}"'
@@ -67,17 +61,15 @@ class RequestGenerator:
         exec_times: list[float] = self._fm.trace["dur_ms"].to_list()
         invocs: list[int] = self._fm.trace["inv_count"].to_list()
         reorder = np.argsort(invocs)[::-1]  # indices sorted by invoc count
-        minute_columns: list[str] = list(map(str, range(1, self.TOTAL_MINUTES + 1)))
-        minutes = self._fm.trace[minute_columns].to_numpy()
+        start = self._fm.minute_col_start
+        minutes = self._fm.trace.iloc[:, start : start + self.TOTAL_MINUTES].to_numpy(
+            dtype=np.int64
+        )
 
         if self.config.time_scaling == "thumbnails":
             assert self.TOTAL_MINUTES % self.config.target_minutes == 0
             pg = self.TOTAL_MINUTES // self.config.target_minutes  # pg: per_group
-            columns = [
-                minutes[:, (pg * i) : (pg * (i + 1))].sum(axis=1, keepdims=True)
-                for i in range(self.config.target_minutes)
-            ]
-            minutes = np.concatenate(columns, axis=1)
+            minutes = minutes.reshape(-1, self.config.target_minutes, pg).sum(axis=2)
             minutes_header = [
                 f"{pg * i + 1}-{pg * (i + 1)}"
                 for i in range(self.config.target_minutes)
@@ -99,19 +91,17 @@ class RequestGenerator:
         max_rpm = max(total_rpm)
         target_max_rpm = self.config.max_rps * 60  # target max RPS --> target max RPM
 
-        # Normalize and round down
-        vec_custom_round = np.vectorize(custom_round)
-        minutes = vec_custom_round(minutes * target_max_rpm / max_rpm)
-        non_zero_rows_indices = np.where(minutes.any(axis=1))[0]
+        # Normalize and round (see `ops.round_threshold`)
+        minutes = round_threshold(minutes * target_max_rpm / max_rpm)
+        nonzero_mask = minutes.any(axis=1)
+        minutes_list: list[list[int]] = minutes.tolist()
 
         sorted_rows = []
         for i in reorder:
-            if i not in non_zero_rows_indices:
+            if not nonzero_mask[i]:
                 continue
             sorted_rows.append(
-                SpecificationRow(
-                    exec_times[i], self._fm(exec_times[i]), minutes[i].tolist()
-                )
+                SpecificationRow(exec_times[i], self._fm.mapping[i], minutes_list[i])
             )
 
         headers = ["avg", "mapped_wreq"] + minutes_header
@@ -119,15 +109,20 @@ class RequestGenerator:
         return Specification(headers, sorted_rows)
 
     # Paper: 3.2.2 Smirnov Transform Mode
-    def smirnov_generate_single(self) -> tuple[float, Workload]:
+    def smirnov_generate_single(
+        self, rng: np.random.Generator
+    ) -> tuple[float, Workload]:
         """
         Generate a single invocation request employing FaaSRail's "Smirnov
         Transform" (or "Inverse Transform Sampling") mode.
+
+        :param rng: e.g., `np.random.default_rng(seed)`; successive calls with
+            it yield the same samples as `smirnov_generate(seed)`, in order
         """
-        rand_cdf_y = random.uniform(0, 1)
+        rand_cdf_y = rng.random()
         chosen_exec_time = self.exec_time_dist.inverse_cdf(rand_cdf_y)
         assert chosen_exec_time >= 0, "Negative execution time in inverse CDF"
-        return chosen_exec_time, self._fm(chosen_exec_time)
+        return chosen_exec_time, self._exec_time_to_wl[chosen_exec_time]
 
     def smirnov_generate(self, seed: int = DEFAULT_SEED) -> Specification:
         """
@@ -139,21 +134,49 @@ class RequestGenerator:
                 f'RequestGenerator instance configured for "{self.config.gen_mode}"'
                 ' rather than "smirnov"'
             )
-        random.seed(seed)
-
-        generated_wls: dict[str, SpecificationRow] = {}
-        for m in range(self.config.target_minutes):
-            for _ in range(self.config.max_rps * 60):  # RPS --> RPM
-                exec_time, wl = self.smirnov_generate_single()
-                bench_name = wl.get_name()
-                if bench_name not in generated_wls:
-                    generated_wls[bench_name] = SpecificationRow(
-                        exec_time, wl, [0] * self.config.target_minutes
-                    )
-                generated_wls[bench_name].minutes[m] += 1  # permitted despite frozen
+        rpm = self.config.max_rps * 60  # RPS --> RPM
+        rng = np.random.default_rng(seed)
+        rand_cdf_y = rng.random(self.config.target_minutes * rpm)
+        chosen_exec_times = self.exec_time_dist.inverse_cdf_batch(rand_cdf_y)
+        assert (chosen_exec_times >= 0).all(), "Negative execution time in inverse CDF"
+
+        # Assign each Workload a row id, in order of first appearance among
+        # the samples; distinct execution times may map to the same Workload
+        exec_times, first_seen, time_idx = np.unique(
+            chosen_exec_times, return_index=True, return_inverse=True
+        )
+        wl_to_idx: dict[str, int] = {}
+        wls: list[Workload] = []
+        wl_exec_times: list[float] = []
+        time_to_wl_idx = np.empty(len(exec_times), dtype=np.intp)
+        for j in np.argsort(first_seen).tolist():
+            exec_time = exec_times[j].item()
+            wl = self._exec_time_to_wl[exec_time]
+            bench_name = wl.get_name()
+            if bench_name not in wl_to_idx:
+                wl_to_idx[bench_name] = len(wls)
+                wls.append(wl)
+                wl_exec_times.append(exec_time)
+            time_to_wl_idx[j] = wl_to_idx[bench_name]
+
+        # Tally samples per (Workload, minute) pair in a single pass
+        target_minutes = self.config.target_minutes
+        minute_idx = np.arange(len(chosen_exec_times)) // rpm
+        counts = (
+            np.bincount(
+                time_to_wl_idx[time_idx] * target_minutes + minute_idx,
+                minlength=len(wls) * target_minutes,
+            )
+            .reshape(len(wls), target_minutes)
+            .astype(np.int32)
+        )
 
         # Sort rows by invocation count (in descending order):
-        sorted_rows = sorted(generated_wls.values(), key=lambda row: -sum(row.minutes))
+        order = np.argsort(-counts.sum(axis=1), kind="stable")
+        sorted_rows = [
+            SpecificationRow(wl_exec_times[k], wls[k], counts[k])
+            for k in order.tolist()
+        ]
 
         headers = ["avg", "mapped_wreq"] + list(
             map(str, range(1, self.config.target_minutes + 1))
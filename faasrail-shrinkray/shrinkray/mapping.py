@@ -47,13 +47,17 @@ class FunctionMapping(object):
         # NOTE: Both dataframes are already sorted by mean execution time
         self._trace = trace_functions.groupby("dur_ms").sum().reset_index()
         self._workloads = workloads
+        # Position of the first of the (contiguous) per-minute columns
+        self._minute_col_start: int = self._trace.columns.get_loc("1")
+        assert self._trace.columns[self._minute_col_start + 1439] == "1440"
 
         # Paper: 3.1.3 Mapping Functions to Workloads [Par. 1 & 2]
         candidates = self._pick_candidates()
         # Paper: 3.1.3 Mapping Functions to Workloads [Par. 3]
         unique = self._unique_benchmarks_per_function(candidates)
         chosen_bench = self._greedy_glb(unique)
-        self.mapping = self._get_mapping(candidates, chosen_bench)
+        # The i-th Workload is the one mapped to the i-th row of `self.trace`
+        self.mapping: list[Workload] = self._get_mapping(candidates, chosen_bench)
 
         # Construct an inverse index for exec time (for performance, instead
         # of binary searching on each `FunctionMapping.__call__()`):
@@ -64,61 +68,45 @@ class FunctionMapping(object):
     def trace(self) -> pd.DataFrame:
         return self._trace
 
+    @property
+    def minute_col_start(self) -> int:
+        return self._minute_col_start
+
     # Implementation detail: Having the dataframes already sorted makes our
-    # idea realizable via a simple linear scan with a bit of backtracking.
-    def _pick_candidates(self) -> list[list[int]]:
+    # idea realizable via a couple of binary searches per trace function.
+    def _pick_candidates(self) -> list[range]:
         RADIUS_FRAC = 0.0100  # +/- 1.00%
-        t_len = len(self._trace)
-
-        s_idx = 1  # Skip the guard
 
         # Sorted, by construction
-        t_times = self._trace["dur_ms"].to_list()
-        s_times = self._workloads.index.to_list()
+        t_times = self._trace["dur_ms"].to_numpy(dtype=np.float64)
+        s_times = self._workloads.index.to_numpy(dtype=np.float64)
+
+        # Collect everything within each function's radius
+        l_idx = np.searchsorted(s_times, (1 - RADIUS_FRAC) * t_times, side="left")
+        r_idx = np.searchsorted(s_times, (1 + RADIUS_FRAC) * t_times, side="right")
+
+        # We collected nothing: just add the closest point(s)
+        empty = l_idx == r_idx
         # Guards to make our code cleaner
-        s_times = [float("-inf")] + s_times + [float("inf")]
-
-        candidates = [[] for _ in range(t_len)]
-
-        for t_idx in range(0, t_len):
-            t_time = t_times[t_idx]
-            l_border = (1 - RADIUS_FRAC) * t_time
-            r_border = (1 + RADIUS_FRAC) * t_time
-
-            # Case 1:
-            # There is overlap with the previous function's radius, go back
-            while s_times[s_idx] > l_border:
-                s_idx -= 1
-            # Case 2: (Most common) We are in no radius
-            while s_times[s_idx] < l_border:
-                s_idx += 1
-            # Collect everything within this function's radius
-            while s_times[s_idx] <= r_border:
-                # Don't forget about the guard
-                candidates[t_idx].append(s_idx - 1)
-                s_idx += 1
-
-            # We collected nothing: just add the closest point(s)
-            if not candidates[t_idx]:
-                l_dist = t_times[t_idx] - s_times[s_idx - 1]
-                r_dist = s_times[s_idx] - t_times[t_idx]
-                if l_dist <= r_dist:
-                    candidates[t_idx].append(s_idx - 1 - 1)
-                if l_dist >= r_dist:
-                    candidates[t_idx].append(s_idx - 1)
-
-        return candidates
+        s_guarded = np.concatenate(([-np.inf], s_times, [np.inf]))
+        l_dist = t_times - s_guarded[l_idx]
+        r_dist = s_guarded[l_idx + 1] - t_times
+        l_idx = np.where(empty & (l_dist <= r_dist), l_idx - 1, l_idx)
+        r_idx = np.where(empty & (l_dist >= r_dist), r_idx + 1, r_idx)
+
+        return [range(lo, hi) for lo, hi in zip(l_idx.tolist(), r_idx.tolist())]
 
     def _unique_benchmarks_per_function(
-        self, candidates: list[list[int]]
+        self, candidates: list[range]
     ) -> list[list[int]]:
+        # The benchmarks found in each row of `self._workloads`
+        bench_sets = [
+            frozenset(wl.benchmark for wl in wls)
+            for wls in self._workloads["workloads"].tolist()
+        ]
         unique_benchmarks = [None] * len(candidates)
         for i, c in enumerate(candidates):
-            curr_function: set[int] = set()
-            for workload_id in c:
-                for wl in self._workloads.iloc[workload_id, 0]:
-                    curr_function.add(wl.benchmark)
-            unique_benchmarks[i] = list(curr_function)
+            unique_benchmarks[i] = list(set().union(*[bench_sets[w] for w in c]))
         return unique_benchmarks
 
     def _greedy_glb(self, permitted_machines: list[list[int]]) -> list[int]:
@@ -142,31 +130,36 @@ class FunctionMapping(object):
         # Machines <-> FunctionBench benchmarks
         # Jobs <-> Real functions
         num_jobs = len(permitted_machines)
-        unique_machines = set(flatten2d(permitted_machines))
-        supply = self._trace["inv_count"].tolist()
-
-        load = {m: 0 for m in unique_machines}
+        machines = sorted(set(flatten2d(permitted_machines)))
+        machine_idx = {m: k for k, m in enumerate(machines)}
+        permitted_idx = [
+            np.array([machine_idx[m] for m in pm], dtype=np.intp)
+            for pm in permitted_machines
+        ]
+        supply = self._trace["inv_count"].to_numpy(dtype=np.int64)
+
+        load = np.zeros(len(machines), dtype=np.int64)
         scheduling = [-1] * num_jobs
-        remaining_quota = {m: 0 for m in unique_machines}
-        for j, pm in enumerate(permitted_machines):
-            for machine in pm:
-                remaining_quota[machine] += supply[j]
+        remaining_quota = np.zeros(len(machines), dtype=np.int64)
+        np.add.at(
+            remaining_quota,
+            np.concatenate(permitted_idx),
+            np.repeat(supply, [len(pm) for pm in permitted_idx]),
+        )
 
         sorted_ind = np.argsort(supply)
         for i in reversed(sorted_ind):
             # Find the permitted machine with the least load
-            min_mach = min(
-                permitted_machines[i], key=lambda i: load[i] + remaining_quota[i]
-            )
-            scheduling[i] = min_mach
+            pm = permitted_idx[i]
+            min_mach = pm[(load[pm] + remaining_quota[pm]).argmin()]
+            scheduling[i] = machines[min_mach]
             load[min_mach] += supply[i]
-            for machine in permitted_machines[i]:
-                remaining_quota[machine] -= supply[i]
+            remaining_quota[pm] -= supply[i]
 
         return scheduling
 
     def _get_mapping(
-        self, candidates: list[list[int]], chosen_benchmark: list[int]
+        self, candidates: list[range], chosen_benchmark: list[int]
     ) -> list[Workload]:
         """
         :param candidates: the indices of possible workloads that may be used
@@ -174,13 +167,18 @@ class FunctionMapping(object):
         :param chosen_benchmark: what specific benchmark we want to use for
         each function i to preserve balancing
         """
-        wls = self._workloads["workloads"].tolist()
+        # For each row of `self._workloads`, the first Workload of each benchmark
+        # (hence the reversal, since later insertions overwrite earlier ones)
+        wl_by_bench_per_row = [
+            {wl.benchmark: wl for wl in reversed(wls)}
+            for wls in self._workloads["workloads"].tolist()
+        ]
 
         def pick_workload(i: int) -> Workload:
             for wl_id in candidates[i]:
-                for wl in wls[wl_id]:
-                    if wl.benchmark == chosen_benchmark[i]:
-                        return wl
+                wl = wl_by_bench_per_row[wl_id].get(chosen_benchmark[i])
+                if wl is not None:
+                    return wl
             raise RuntimeError("Unreachable: auxiliary function always returns")
 
         return list(map(pick_workload, range(len(candidates))))
@@ -0,0 +1,24 @@
+r"""
+Element-wise numeric helpers, implemented purely in NumPy.
+
+Avoid `np.vectorize` for such operations: it is merely a Python-level loop in
+disguise. Add vectorized helpers here instead; something like
+
+    $ grep -rn 'np\.vectorize(' shrinkray/
+
+should come up empty.
+"""
+
+import numpy as np
+
+
+def round_threshold(
+    x: np.ndarray, thresh: float = 0.35, dtype: type = np.intc
+) -> np.ndarray:
+    """
+    Round each element of `x` down if its fractional part is less than
+    `thresh`, or up otherwise (e.g., for the default `thresh`, 1.3 becomes 1
+    but 1.4 becomes 2).
+    """
+    floor = np.floor(x)
+    return np.where(x - floor < thresh, floor, floor + 1).astype(dtype)
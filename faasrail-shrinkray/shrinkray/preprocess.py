@@ -1,11 +1,45 @@
-import json
+from collections import defaultdict
+from itertools import repeat
 import os
 
 import numpy as np
 import pandas as pd
 
+from utils import json_loads
+from utils_numba import scan_minutes
 from workload import Workload
 
+try:
+    # Optional: PyArrow's multithreaded CSV reader is much faster on the trace
+    import pyarrow  # noqa: F401
+
+    _CSV_ENGINE = "pyarrow"
+except ImportError:
+    _CSV_ENGINE = "c"
+
+# With Copy-on-Write, intermediate DataFrames (selections, renames, etc.) share
+# their data with their parents, rather than each of them copying it.
+pd.set_option("mode.copy_on_write", True)
+
+# Labels of the per-minute invocation count columns of the trace
+_MINUTE_COLS = [str(i) for i in range(1, 1441)]
+
+# Columns of interest in the function durations part of the trace, along with
+# the (shorter) names we use for them
+_FDUR_RENAMES = {
+    "Average": "dur_ms",
+    "Count": "cnt",
+    "Minimum": "min",
+    "Maximum": "max",
+    "percentile_Average_0": "p0",
+    "percentile_Average_1": "p1",
+    "percentile_Average_25": "p25",
+    "percentile_Average_50": "p50",
+    "percentile_Average_75": "p75",
+    "percentile_Average_99": "p99",
+    "percentile_Average_100": "p100",
+}
+
 
 def workloads_preprocess(workloads_file_path: str) -> pd.DataFrame:
     """
@@ -14,107 +48,148 @@ def workloads_preprocess(workloads_file_path: str) -> pd.DataFrame:
 
     ?TODO(phtof): For now, we ignore `stdev`.
     """
-    with open(workloads_file_path) as fin:
-        workloads_json = json.load(fin)
+    with open(workloads_file_path, "rb") as fin:
+        workloads_json = json_loads(fin.read())
     workloads = pd.DataFrame(workloads_json).sort_values(by=["mean"])
     workloads.rename(columns={"mean": "dur_ms"}, inplace=True)
 
-    workloads["wl"] = workloads.apply(lambda row: Workload(row), axis=1)
-    workloads.drop(columns=["bench", "payload"], inplace=True)
+    # We have two different kinds of measurements (icy{1,2}*.json)
+    # and the first one has no "mem_mib" field
+    mem = (
+        workloads["mem_mib"].tolist()
+        if "mem_mib" in workloads.columns
+        else repeat(None)
+    )
+    dur_ms = workloads["dur_ms"].tolist()
+    wls = [
+        Workload.from_fields(b, p, d, m)
+        for b, p, d, m in zip(
+            workloads["bench"].tolist(), workloads["payload"].tolist(), dur_ms, mem
+        )
+    ]
+
+    # Group Workloads by execution time; since these are already sorted, so
+    # are the buckets (in insertion order)
+    buckets: defaultdict[float, list[Workload]] = defaultdict(list)
+    for d, wl in zip(dur_ms, wls):
+        buckets[d].append(wl)
 
-    return workloads.groupby(by=["dur_ms"])["wl"].apply(list).to_frame("workloads")
+    return pd.DataFrame(
+        {"workloads": list(buckets.values())},
+        index=pd.Index(list(buckets.keys()), name="dur_ms"),
+    )
 
 
 def function_durations_percentiles(
     day: int,
     dirpath: str = "",
 ) -> pd.DataFrame:
-    return (
-        pd.read_csv(
-            os.path.join(dirpath, f"function_durations_percentiles.anon.d{day:02}.csv")
-        )
-        # use shorter names that I'm used to:
-        .rename(
-            {
-                "Average": "dur_ms",
-                "Count": "cnt",
-                "Minimum": "min",
-                "Maximum": "max",
-                "percentile_Average_0": "p0",
-                "percentile_Average_1": "p1",
-                "percentile_Average_25": "p25",
-                "percentile_Average_50": "p50",
-                "percentile_Average_75": "p75",
-                "percentile_Average_99": "p99",
-                "percentile_Average_100": "p100",
-            },
-            axis=1,
-        )
-        # drop all na (though iirc there shouldn't be any?):
-        .dropna()
-        # rearrange columns for better visualization in ipynb:
-        .loc[
-            :,
-            [
-                "dur_ms",
-                "cnt",
-                "min",
-                "max",
-                "p0",
-                "p1",
-                "p25",
-                "p50",
-                "p75",
-                "p99",
-                "p100",
-                "HashFunction",
-                "HashApp",
-                "HashOwner",
-            ],
-        ]
+    fdf = pd.read_csv(
+        os.path.join(dirpath, f"function_durations_percentiles.anon.d{day:02}.csv"),
+        engine=_CSV_ENGINE,
+    )
+    # NOTE: rows with missing values are dropped by `joined_func_invoc_df`
+    # Rearrange columns for better visualization in ipynb first, and then use
+    # shorter names that I'm used to (neither copies any data under CoW):
+    fdf = fdf[[*_FDUR_RENAMES, "HashFunction", "HashApp", "HashOwner"]].rename(
+        columns=_FDUR_RENAMES
+    )
+    # Durations (in ms) and counts are integral in the trace and (normally) fit
+    # in 32 bits, which halves their footprint in the merge and grouping that
+    # follow; only narrow the columns that do, as casting silently wraps around.
+    # Floating point columns (e.g., due to missing values) are left intact, as
+    # "dur_ms" values end up verbatim in the generated specifications.
+    i32 = np.iinfo(np.int32)
+    return fdf.astype(
+        {
+            col: np.int32
+            for col in fdf.columns
+            if pd.api.types.is_integer_dtype(fdf[col].dtype)
+            and fdf[col].between(i32.min, i32.max).all()
+        }
     )
 
 
-def invocations_per_function_md(day: int, dirpath: str = "") -> pd.DataFrame:
+def invocations_per_function_md(
+    day: int, dirpath: str = ""
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Returns the Functions of the given day (i.e., their Hash triplet, Trigger
+    and total number of invocations) along with their per-minute invocation
+    counts, as a separate C-contiguous (minute x function) array. The column of
+    the latter that corresponds to each row is given by its "minutes_idx".
+    """
     idf = pd.read_csv(
-        os.path.join(dirpath, f"invocations_per_function_md.anon.d{day:02}.csv")
-    ).dropna()  # drop all na (though iirc there shouldn't be any?)
+        os.path.join(dirpath, f"invocations_per_function_md.anon.d{day:02}.csv"),
+        engine=_CSV_ENGINE,
+    )
+    # NOTE: rows with missing per-minute counts are dropped below, whereas rows
+    # with missing values in any other column by `joined_func_invoc_df`
 
     minute_cols = idf.columns[idf.columns.str.isdigit()]
     # Assert that every column with all-digits name refers to invocations per
-    # minute, and that none of them is missing:
-    assert (minute_cols.map(int) == np.arange(1, 1441)).all()
+    # minute, in order, and that none of them is missing; the per-minute counts
+    # are labeled by position from now on (see `azure_trace_preprocess`):
+    assert minute_cols.tolist() == _MINUTE_COLS, "unexpected minute columns"
 
-    # Drop all rows that contain negative # of invocations in any of its
+    # pandas stores the minute columns as a single (columns x rows) block, hence
+    # the `.to_numpy()` array is column-major: transposing it yields a
+    # C-contiguous (minute x function) array for free. Keep it out of the
+    # DataFrame from now on, so that merging, filtering and sorting the latter
+    # does not copy it around every time.
+    minutes = np.ascontiguousarray(idf[minute_cols].to_numpy().T)
+    idf.drop(columns=minute_cols, inplace=True)
+    if not np.issubdtype(minutes.dtype, np.integer):
+        # Some per-minute counts are missing; count them as negative, so that
+        # their rows are dropped below as well
+        minutes = np.nan_to_num(minutes, nan=-1).astype(np.int64)
+    # Calculate total # of invocations per Function based on per-minute data
+    # (accumulating the counts in int64, regardless of the platform),
+    # and drop all rows that contain negative # of invocations in any of its
     # minute column:
-    _midf: pd.DataFrame = idf.loc[:, minute_cols]
-    idf.drop(_midf.loc[(_midf < 0).any(axis=1)].index, inplace=True)
-
-    # Calculate total # of invocations per Function based on per-minute data:
-    idf["cnt_finv"] = idf[minute_cols].sum(axis=1)
+    totals, valid, highest = scan_minutes(minutes)
+    # Per-minute invocation counts easily fit in int32, at half the memory of
+    # int64; narrow them unless casting would silently wrap around bogus ones
+    # (of the rows we keep, since the rest are never looked at again):
+    if highest.max(initial=0, where=valid) <= np.iinfo(np.int32).max:
+        minutes = minutes.astype(np.int32)
 
-    return idf
+    return (
+        idf.loc[valid].assign(
+            cnt_finv=totals[valid], minutes_idx=np.flatnonzero(valid)
+        ),
+        minutes,
+    )
 
 
-def joined_func_invoc_df(day: int, dirpath: str = "") -> pd.DataFrame:
-    jdf = (
-        function_durations_percentiles(day, dirpath)
-        .rename(columns={"cnt": "cnt_fdur"})
-        .merge(
-            invocations_per_function_md(day, dirpath),
-            how="inner",
-            on=["HashFunction", "HashApp", "HashOwner"],
-        )
-        .rename(columns={"cnt_finv": "inv_count"})
+def joined_func_invoc_df(
+    day: int, dirpath: str = ""
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Returns the inner join of the given day's Function durations and
+    invocations, along with the per-minute invocation counts array of the
+    latter (see `invocations_per_function_md`).
+    """
+    idf, minutes = invocations_per_function_md(day, dirpath)
+    # NOTE: pandas already factorizes each of the join keys into integer codes
+    # internally; (re)encoding the Hash triplet into a single integer key
+    # ourselves (MultiIndex or Categorical codes) was measured to be slower.
+    jdf = function_durations_percentiles(day, dirpath).merge(
+        idf,
+        how="inner",
+        on=["HashFunction", "HashApp", "HashOwner"],
     )
+    jdf.rename(columns={"cnt": "cnt_fdur", "cnt_finv": "inv_count"}, inplace=True)
     # Use median in cases where mean is invalid:
     # Replace mean with median in cases where the former is invalid. Drop the
     # whole row if the median is invalid too.
-    jdf["dur_ms"] = jdf["dur_ms"].where(jdf["dur_ms"] >= 0, jdf["p50"])
-    jdf.drop(jdf.loc[jdf["dur_ms"] < 0].index, inplace=True)
+    dur_ms = jdf["dur_ms"].where(jdf["dur_ms"] >= 0, jdf["p50"])
+    # Also drop all rows with missing values coming from either of the input
+    # files (though iirc there shouldn't be any?), so that we filter only once
+    valid = jdf.notna().all(axis=1) & (dur_ms >= 0)
     # FIXME: Apart from the mean, other data might be bad too; maybe just drop
     # such rows? (minute cols are already checked btw, and dropped if invalid)
-    return jdf
+    return jdf.loc[valid].assign(dur_ms=dur_ms[valid]), minutes
 
 
 def azure_trace_preprocess(trace_dir_path: str) -> pd.DataFrame:
@@ -188,9 +263,34 @@ def azure_trace_preprocess(trace_dir_path: str) -> pd.DataFrame:
     #
     # return christos
 
-    return (
-        joined_func_invoc_df(1, trace_dir_path)
-        .groupby(by=["dur_ms"])
-        .sum()
-        .drop(columns=["HashFunction", "HashApp", "HashFunction"])
-    )
+    # NOTE: Porting the whole pipeline (reads, join, filters and the grouping
+    # below) to a single lazy Polars query was measured to be ~2x slower than
+    # this on a day's trace, mostly due to the 1440-column horizontal min/sum
+    # and join; it would also add a dependency to the environments.
+    #
+    # Sum up all Functions of equal execution time. Once sorted, each group is a
+    # contiguous run of rows, so all columns of the same dtype can be reduced
+    # in a single pass over their (column x row) block.
+    jdf, minutes = joined_func_invoc_df(1, trace_dir_path)
+    jdf = jdf.sort_values(by="dur_ms", kind="stable")
+    dur_ms = jdf["dur_ms"].to_numpy()
+    starts = np.flatnonzero(np.concatenate(([True], dur_ms[1:] != dur_ms[:-1])))
+    # Gather the per-minute invocations in sorted order, in a single pass
+    minutes = minutes[:, jdf["minutes_idx"].to_numpy()]
+    blocks = [
+        pd.DataFrame(
+            np.add.reduceat(minutes, starts, axis=1, dtype=np.int64).T,
+            columns=_MINUTE_COLS,
+        )
+    ]
+    # The Hash triplet and the Trigger cannot be meaningfully summed; drop them
+    values = jdf.drop(columns=["dur_ms", "minutes_idx"]).select_dtypes(include="number")
+    for dtype, cols in values.columns.groupby(values.dtypes).items():
+        acc = np.int64 if np.issubdtype(dtype, np.integer) else None
+        sums = np.add.reduceat(values[cols].to_numpy().T, starts, axis=1, dtype=acc)
+        blocks.append(pd.DataFrame(sums.T, columns=cols))
+    # Place the minute columns right before "inv_count", as in the trace
+    columns = [*values.columns.drop("inv_count"), *_MINUTE_COLS, "inv_count"]
+    trace = pd.concat(blocks, axis=1)[columns]
+    trace.index = pd.Index(dur_ms[starts], name="dur_ms")
+    return trace
@@ -1,6 +1,9 @@
 import csv
 from dataclasses import dataclass
-from typing import Any
+from itertools import chain
+from typing import Any, Iterator
+
+import numpy as np
 
 from workload import Workload
 
@@ -9,10 +12,23 @@ from workload import Workload
 class SpecificationRow:
     trace_exec_time: float
     workload: Workload
-    minutes: list[int]
+    minutes: list[int] | np.ndarray
+
+    def __post_init__(self) -> None:
+        # Stringify the Workload only once, rather than on every export
+        object.__setattr__(self, "_workload_str", str(self.workload))
+
+    def to_iter(self) -> Iterator[Any]:
+        """
+        Iterate over the fields of this row, without copying its minutes.
+        """
+        minutes = self.minutes
+        if isinstance(minutes, np.ndarray):
+            minutes = minutes.tolist()
+        return chain((self.trace_exec_time, self._workload_str), minutes)
 
     def to_list(self) -> list[Any]:
-        return [self.trace_exec_time, str(self.workload)] + self.minutes
+        return list(self.to_iter())
 
 
 @dataclass(frozen=True)
@@ -28,5 +44,4 @@ class Specification:
         """
         writer = csv.writer(fout)
         writer.writerow(self.headers)
-        for row in self.sorted_rows:
-            writer.writerow(row.to_list())
+        writer.writerows(row.to_iter() for row in self.sorted_rows)
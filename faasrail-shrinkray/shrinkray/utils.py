@@ -1,6 +1,15 @@
+from itertools import chain
 from typing import Any
 
+try:
+    # Optional: orjson parses JSON several times faster than the stdlib
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+__all__ = ["flatten2d", "json_loads"]
+
 
 def flatten2d(ll: list[list[Any]]) -> list[Any]:
     """Flatten two dimensional list"""
-    return [e for l in ll for e in l]
+    return list(chain.from_iterable(ll))
@@ -0,0 +1,51 @@
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # Numba is optional; without it, fall back to (unfused) NumPy reductions
+    njit = None
+
+# Number of Functions (i.e., columns) each parallel iteration scans; small
+# enough for their running totals to stay in cache across all minutes.
+_SCAN_CHUNK = 1024
+
+
+def _scan_minutes_numpy(
+    minutes: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return (
+        minutes.sum(axis=0, dtype=np.int64),
+        minutes.min(axis=0) >= 0,
+        minutes.max(axis=0),
+    )
+
+
+if njit is None:
+    scan_minutes = _scan_minutes_numpy
+else:
+
+    @njit(parallel=True, cache=True)
+    def scan_minutes(
+        minutes: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Given a C-contiguous (minute x function) array of invocation counts,
+        return the total number of invocations of each Function (in int64),
+        whether all of its counts are non-negative, and its highest count, in a
+        single pass.
+        """
+        n_minutes, n_funcs = minutes.shape
+        totals = np.zeros(n_funcs, dtype=np.int64)
+        lowest = np.zeros(n_funcs, dtype=minutes.dtype)
+        highest = np.zeros(n_funcs, dtype=minutes.dtype)
+        for chunk in prange((n_funcs + _SCAN_CHUNK - 1) // _SCAN_CHUNK):
+            lo = chunk * _SCAN_CHUNK
+            hi = min(lo + _SCAN_CHUNK, n_funcs)
+            for m in range(n_minutes):
+                for f in range(lo, hi):
+                    v = minutes[m, f]
+                    totals[f] += v
+                    lowest[f] = min(lowest[f], v)
+                    highest[f] = max(highest[f], v)
+        return totals, lowest >= 0, highest
@@ -5,6 +5,8 @@ from typing import Any, Optional
 
 import pandas as pd
 
+from utils import json_loads
+
 
 @dataclass(init=False, frozen=True)
 class Workload:
@@ -23,33 +25,72 @@ class Workload:
     def __init__(self, row: pd.Series) -> None:
         # We have two different kinds of measurements (icy{1,2}*.json)
         # and the first one has no "mem_mib" field
-
-        # https://docs.python.org/3/library/dataclasses.html#frozen-instances
-        object.__setattr__(self, "benchmark", row.loc["bench"])
-        object.__setattr__(self, "payload", json.loads(row.loc["payload"]))
-        object.__setattr__(self, "exec_time_ms", row.loc["dur_ms"])
-        object.__setattr__(
-            self, "memory_mb", row.loc["mem_mib"] if "mem_mib" in row.keys() else None
+        self._init_fields(
+            row.loc["bench"],
+            row.loc["payload"],
+            row.loc["dur_ms"],
+            row.loc["mem_mib"] if "mem_mib" in row.keys() else None,
         )
 
-    def get_name(self) -> str:
+    @classmethod
+    def from_fields(
+        cls,
+        benchmark: str,
+        payload_json: str,
+        exec_time_ms: int,
+        memory_mb: Optional[int],
+    ) -> "Workload":
         """
-        Returns a fixed size str that identifies this Workload, formatted as:
-        "{bench_name}-{payload hash}"
+        Initialize based on plain field values, sparing the construction of a
+        pandas row per Workload.
         """
+        wl = cls.__new__(cls)
+        wl._init_fields(benchmark, payload_json, exec_time_ms, memory_mb)
+        return wl
+
+    def _init_fields(
+        self,
+        benchmark: str,
+        payload_json: str,
+        exec_time_ms: int,
+        memory_mb: Optional[int],
+    ) -> None:
+        # https://docs.python.org/3/library/dataclasses.html#frozen-instances
+        object.__setattr__(self, "benchmark", benchmark)
+        object.__setattr__(self, "payload", json_loads(payload_json))
+        object.__setattr__(self, "exec_time_ms", exec_time_ms)
+        object.__setattr__(self, "memory_mb", memory_mb)
+
+        # Both are immutable and needed over and over again (e.g., per row of
+        # an exported specification), so serialize and hash only once
+        object.__setattr__(self, "_payload_json", json.dumps(self.payload))
+        object.__setattr__(self, "_name", self._make_name())
+
+    def _make_name(self) -> str:
+        # NOTE: Names double as FaaSCell function IDs, and also end up in
+        # previously generated specifications; switching to a faster hash
+        # (e.g., BLAKE2) would silently break the correspondence with those.
+        # It is computed once per Workload anyway.
         FUNCTION_ID_LEN = 24
-        payload_encoded = json.dumps(self.payload).encode("utf-8")
+        payload_encoded = self._payload_json.encode("utf-8")
         payload_hash = hashlib.sha256(payload_encoded).hexdigest()[
             : FUNCTION_ID_LEN - len(self.benchmark) - 1
         ]
         return f"{self.benchmark}-{payload_hash}"
 
+    def get_name(self) -> str:
+        """
+        Returns a fixed size str that identifies this Workload, formatted as:
+        "{bench_name}-{payload hash}"
+        """
+        return self._name
+
     def __str__(self):
         # Keep generated `self.__repr__` for debugging, and override only this
         return json.dumps(
             {
                 "mean": self.exec_time_ms,
-                "bench": self.get_name(),
-                "payload": json.dumps(self.payload),
+                "bench": self._name,
+                "payload": self._payload_json,
             }
         )